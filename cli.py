@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Education Analytics Platform - Command Line Interface
+=====================================================
+
+Single entry point for every pipeline stage:
+
+    python cli.py ingest | silver | gold | spark | export | serve | bench
+
+Heavy dependencies (pandas, PySpark, schedule) are imported inside the
+subcommand that needs them, so --help and light subcommands start quickly.
+"""
+
+import argparse
+import sys
+import time
+
+def cmd_ingest(args):
+    from medallion_pandas import ingest_to_bronze
+    ingest_to_bronze()
+    return True
+
+def cmd_silver(args):
+    from medallion_pandas import transform_to_silver
+    transform_to_silver()
+    return True
+
+def cmd_gold(args):
+    from medallion_pandas import create_gold_analytics
+    from risk_scoring import load_risk_coefficients
+    create_gold_analytics(args.distinct_mode, load_risk_coefficients(args.risk_coefficients))
+    return True
+
+def cmd_spark(args):
+    from education_pyspark_setup import ensure_spark_environment
+    if not ensure_spark_environment():
+        return False
+
+    from risk_scoring import load_risk_coefficients
+    from spark_analytics import run_spark_analytics
+    return run_spark_analytics(args.distinct_mode, load_risk_coefficients(args.risk_coefficients))
+
+def cmd_export(args):
+    from export_powerbi import export_analytics_for_powerbi
+    return export_analytics_for_powerbi() > 0
+
+def cmd_serve(args):
+    from pipeline_scheduler import logger, start_pipeline_scheduler
+    from risk_scoring import load_risk_coefficients
+    try:
+        start_pipeline_scheduler(args.distinct_mode, load_risk_coefficients(args.risk_coefficients))
+    except KeyboardInterrupt:
+        logger.info("Pipeline scheduler stopped by user")
+    return True
+
+def cmd_bench(args):
+    import numpy as np
+    import pandas as pd
+    from risk_scoring import build_risk_features, score_dropout_risk, score_enrollment_rows
+    from sketches import HyperLogLog, build_quantile_sketches, sketch_quantiles
+
+    print(f"Education Analytics Benchmarks ({args.rows:,} synthetic rows)")
+    print("=" * 47)
+
+    rng = np.random.default_rng(42)
+    school_names = pd.Series([f"School {i}" for i in rng.integers(0, args.rows // 10 + 1, args.rows)])
+    scores = rng.normal(78, 10, args.rows).clip(0, 100)
+    frame = pd.DataFrame({
+        'school_name': school_names,
+        'region': rng.choice(['NORTH', 'SOUTH', 'EAST', 'WEST', 'CENTRAL'], args.rows),
+        'academic_year': rng.integers(2020, 2025, args.rows),
+        'grade': rng.choice(['K', '1', '2', '3', '4', '5'], args.rows),
+        'gender': rng.choice(['Male', 'Female'], args.rows),
+        'enrollment_count': rng.integers(5, 40, args.rows),
+        'performance_score': scores,
+        'attendance_rate': rng.normal(90, 5, args.rows).clip(0, 100)
+    })
+
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<34} {elapsed:8.3f}s  {args.rows / elapsed:>14,.0f} rows/s")
+
+    timed("HyperLogLog distinct count", lambda: HyperLogLog().update(school_names).estimate())
+    timed("Exact distinct count (pandas)", lambda: school_names.nunique())
+
+    sketches = build_quantile_sketches(frame.groupby('region'), ['performance_score'])
+    timed("t-digest build per region", lambda: build_quantile_sketches(frame.groupby('region'), ['performance_score']))
+    timed("Percentiles from region t-digests", lambda: sketch_quantiles(sketches, ['region']))
+    timed("Exact percentiles per region", lambda: frame.groupby('region')['performance_score'].quantile([0.1, 0.5, 0.9]))
+
+    # End to end (features + scoring), then the NumPy scoring kernel on its own
+    timed("Dropout risk scoring (end to end)", lambda: score_enrollment_rows(frame))
+    decline, tiers = build_risk_features(frame)
+    timed("Dropout risk kernel only", lambda: score_dropout_risk(scores, frame['attendance_rate'], decline, tiers))
+    return True
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="School Enrollment & Education Performance Analytics Platform"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("ingest", help="Bronze layer: ingest raw CSV to Parquet") \
+              .set_defaults(func=cmd_ingest)
+    subparsers.add_parser("silver", help="Silver layer: clean and validate bronze data") \
+              .set_defaults(func=cmd_silver)
+
+    for name, func, help_text in [
+        ("gold", cmd_gold, "Gold layer: build business analytics from silver"),
+        ("spark", cmd_spark, "Run the PySpark distributed analytics"),
+        ("serve", cmd_serve, "Run the medallion pipeline daily at 6:00 AM")
+    ]:
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--distinct-mode", choices=["exact", "approx"], default="exact",
+                               help="Count distinct schools exactly or with HyperLogLog sketches")
+        subparser.set_defaults(func=func)
+
+    for name in ["gold", "spark", "serve"]:
+        subparsers.choices[name].add_argument("--risk-coefficients", metavar="JSON",
+                                              help="JSON file overriding the dropout risk coefficients")
+
+    subparsers.add_parser("export", help="Export gold tables as CSV for Power BI") \
+              .set_defaults(func=cmd_export)
+
+    bench = subparsers.add_parser("bench", help="Benchmark sketch, aggregation and risk scoring throughput")
+    bench.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic rows")
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return 0 if args.func(args) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
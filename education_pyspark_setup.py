@@ -4,23 +4,34 @@ PySpark + Power BI Pipeline Setup and Execution Script
 Run this to set up PySpark and process education data for Power BI
 """
 
+import importlib.util
 import subprocess
 import sys
 import os
 from pathlib import Path
 
+# Module name -> pip requirement used when the module is missing
+REQUIRED_PACKAGES = {
+    "pyspark": "pyspark==3.5.0",
+    "pandas": "pandas",
+    "numpy": "numpy",
+    "pyarrow": "pyarrow"
+}
+
+_environment_ready = False
+
 def install_requirements():
-    """Install required packages for PySpark processing"""
-    print("📦 Installing PySpark and dependencies...")
+    """Install required packages for PySpark processing that are not already available"""
+    missing = [package for module, package in REQUIRED_PACKAGES.items()
+               if importlib.util.find_spec(module) is None]
     
-    packages = [
-        "pyspark==3.5.0",
-        "findspark",
-        "pandas",
-        "numpy"
-    ]
+    if not missing:
+        print("✅ PySpark and dependencies already installed")
+        return True
     
-    for package in packages:
+    print("📦 Installing PySpark and dependencies...")
+    
+    for package in missing:
         try:
             subprocess.check_call([sys.executable, "-m", "pip", "install", package])
             print(f"✅ Installed {package}")
@@ -28,15 +39,21 @@ def install_requirements():
             print(f"❌ Failed to install {package}")
             return False
     
+    importlib.invalidate_caches()
     return True
 
 def setup_environment():
     """Set up PySpark environment variables"""
     print("🔧 Setting up PySpark environment...")
     
-    # Set environment variables
-    os.environ['PYSPARK_PYTHON'] = sys.executable
-    os.environ['PYSPARK_DRIVER_PYTHON'] = sys.executable
+    # Set environment variables, keeping any the user already configured
+    os.environ.setdefault('PYSPARK_PYTHON', sys.executable)
+    os.environ.setdefault('PYSPARK_DRIVER_PYTHON', sys.executable)
+    
+    # A pip-installed PySpark is importable as is; findspark is only needed for SPARK_HOME installs
+    if importlib.util.find_spec("pyspark") is not None:
+        print("✅ PySpark environment configured")
+        return True
     
     # Initialize findspark
     try:
@@ -48,6 +65,19 @@ def setup_environment():
         print("❌ Failed to configure PySpark environment")
         return False
 
+def ensure_spark_environment():
+    """One-time, idempotent PySpark environment check
+
+    Safe to call before every Spark run: packages are only installed when
+    missing and the check is skipped once it has passed in this process.
+    """
+    global _environment_ready
+    
+    if not _environment_ready:
+        _environment_ready = install_requirements() and setup_environment()
+    
+    return _environment_ready
+
 def create_directories():
     """Create necessary directories"""
     print("📁 Creating project directories...")
@@ -84,13 +114,15 @@ def run_pyspark_processing():
     """Run PySpark analytics processing"""
     print("⚡ Running PySpark analytics processing...")
     
-    try:
-        subprocess.run([sys.executable, "src/spark_processing/education_analytics.py"], check=True)
+    # Run in this interpreter instead of starting a new one
+    from spark_analytics import run_spark_analytics
+    
+    if run_spark_analytics():
         print("✅ PySpark processing completed")
         return True
-    except subprocess.CalledProcessError:
-        print("❌ PySpark processing failed")
-        return False
+    
+    print("❌ PySpark processing failed")
+    return False
 
 def validate_output_files():
     """Validate that all required files for Power BI are created"""
@@ -145,14 +177,9 @@ def main():
     print("🚀 EDUCATION ANALYTICS PIPELINE SETUP")
     print("="*50)
     
-    # Step 1: Install requirements
-    if not install_requirements():
-        print("❌ Failed to install requirements")
-        return False
-    
-    # Step 2: Setup environment
-    if not setup_environment():
-        print("❌ Failed to setup environment")
+    # Steps 1-2: Install missing requirements and setup environment
+    if not ensure_spark_environment():
+        print("❌ Failed to setup PySpark environment")
         return False
     
     # Step 3: Create directories
@@ -16,7 +16,8 @@ def export_analytics_for_powerbi():
     source_files = {
         'enrollment_trends': 'medallion_architecture/gold/enrollment_trends.parquet',
         'school_performance': 'medallion_architecture/gold/school_performance.parquet',
-        'demographics': 'medallion_architecture/gold/demographics.parquet'
+        'demographics': 'medallion_architecture/gold/demographics.parquet',
+        'school_risk_distribution': 'medallion_architecture/gold/school_risk_distribution.parquet'
     }
     
     exported_files = []
@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 from pathlib import Path
+from risk_scoring import school_risk_distribution, score_enrollment_rows
+from sketches import build_distinct_sketches, build_quantile_sketches, hll_relative_error, summarize_quantile_sketches
 
 def ingest_to_bronze():
     """Bronze Layer: Raw CSV to structured storage"""
@@ -51,8 +53,14 @@ def transform_to_silver():
     print(f"Data cleaning completed. {len(df_clean)} validated records ready for analysis.")
     return df_clean
 
-def create_gold_analytics():
-    """Gold Layer: Business aggregations and analytics"""
+def create_gold_analytics(distinct_mode="exact", risk_coefficients=None):
+    """Gold Layer: Business aggregations and analytics
+
+    distinct_mode="approx" counts schools per region-year with HyperLogLog
+    sketches and stores them in gold so coarser rollups can be answered by
+    merging sketches instead of rescanning silver. risk_coefficients
+    overrides the default dropout risk model (see risk_scoring.py).
+    """
     print("Generating business analytics and insights...")
     
     # Create gold directory
@@ -64,8 +72,12 @@ def create_gold_analytics():
     # Create dropout risk indicators
     df['dropout_risk_flag'] = (df['performance_score'] < 70).astype(int)
     
+    # Percentile sketches are built from the same groupings as the aggregates
+    distribution_cols = ['performance_score', 'attendance_rate']
+    
     # Generate enrollment trends analysis
-    trends = df.groupby(['academic_year', 'region']).agg({
+    region_year_groups = df.groupby(['academic_year', 'region'])
+    trends = region_year_groups.agg({
         'enrollment_count': 'sum',
         'performance_score': 'mean',
         'dropout_risk_flag': 'sum'
@@ -73,14 +85,33 @@ def create_gold_analytics():
     
     trends.columns = ['academic_year', 'region', 'total_enrollment', 'avg_performance', 'high_risk_students']
     
+    # Count distinct schools per region-year, exactly or from mergeable sketches
+    if distinct_mode == "approx":
+        school_sketches = build_distinct_sketches(df, ['academic_year', 'region'], 'school_name', 'school')
+        school_sketches.to_parquet("medallion_architecture/gold/school_count_sketches.parquet", index=False)
+        print(f"Stored school count sketches (relative error ~{hll_relative_error():.1%}).")
+        
+        trends = trends.merge(school_sketches[['academic_year', 'region', 'approx_school_count']], on=['academic_year', 'region'])
+        trends = trends.rename(columns={'approx_school_count': 'school_count'})
+    elif distinct_mode == "exact":
+        school_counts = region_year_groups['school_name'].nunique().reset_index(name='school_count')
+        trends = trends.merge(school_counts, on=['academic_year', 'region'])
+    else:
+        raise ValueError(f"Unknown distinct_mode: {distinct_mode}")
+    
     # Calculate year-over-year growth rates
     trends['growth_rate'] = trends.groupby('region')['total_enrollment'].pct_change() * 100
     trends['growth_rate'] = trends['growth_rate'].round(2)
     
     trends.to_parquet("medallion_architecture/gold/enrollment_trends.parquet", index=False)
     
+    # Region-year t-digests answer region, year and overall percentiles in milliseconds
+    region_distribution_sketches = build_quantile_sketches(region_year_groups, distribution_cols)
+    region_distribution_sketches.to_parquet("medallion_architecture/gold/region_distribution_sketches.parquet", index=False)
+    
     # Generate school performance analysis
-    performance = df.groupby(['school_name', 'region']).agg({
+    school_groups = df.groupby(['school_name', 'region'])
+    performance = school_groups.agg({
         'enrollment_count': 'sum',
         'performance_score': 'mean',
         'dropout_risk_flag': 'sum'
@@ -96,8 +127,25 @@ def create_gold_analytics():
         labels=['Needs Improvement', 'Satisfactory', 'Excellent']
     )
     
+    # School-level t-digests; small schools keep their raw values, so their percentiles are exact
+    school_distribution_sketches = build_quantile_sketches(school_groups, distribution_cols)
+    school_distribution_sketches.to_parquet("medallion_architecture/gold/school_distribution_sketches.parquet", index=False)
+    
+    school_quantiles = summarize_quantile_sketches(
+        school_distribution_sketches, ['school_name', 'region'],
+        {'performance_score': 'score', 'attendance_rate': 'attendance'}
+    )
+    performance = performance.merge(school_quantiles, on=['school_name', 'region'], how='left')
+    
     performance.to_parquet("medallion_architecture/gold/school_performance.parquet", index=False)
     
+    # Score multi-factor dropout risk for every row as one vectorized batch
+    risk_scores = score_enrollment_rows(df, risk_coefficients)
+    risk_scores.to_parquet("medallion_architecture/gold/dropout_risk_scores.parquet", index=False)
+    
+    risk_distribution = school_risk_distribution(risk_scores)
+    risk_distribution.to_parquet("medallion_architecture/gold/school_risk_distribution.parquet", index=False)
+    
     # Generate demographic analysis
     demographics = df.groupby(['academic_year', 'grade', 'gender']).agg({
         'enrollment_count': 'sum'
@@ -111,15 +159,16 @@ def create_gold_analytics():
     
     demographics.to_parquet("medallion_architecture/gold/demographics.parquet", index=False)
     
-    print("Analytics generation completed. Created enrollment trends, school performance, and demographic reports.")
+    print("Analytics generation completed. Created enrollment trends, school performance, demographic and dropout risk reports.")
     
     return {
         'trends': trends,
         'performance': performance, 
-        'demographics': demographics
+        'demographics': demographics,
+        'risk_distribution': risk_distribution
     }
 
-def run_medallion_pipeline():
+def run_medallion_pipeline(distinct_mode="exact", risk_coefficients=None):
     """Execute the complete Education Analytics ETL pipeline"""
     try:
         print("Education Analytics Platform - Data Processing Pipeline")
@@ -132,7 +181,7 @@ def run_medallion_pipeline():
         silver_df = transform_to_silver()
         
         # Execute Gold Layer processing
-        gold_tables = create_gold_analytics()
+        gold_tables = create_gold_analytics(distinct_mode, risk_coefficients)
         
         print("\nPipeline Execution Summary")
         print("-" * 30)
@@ -146,8 +195,14 @@ def run_medallion_pipeline():
             "medallion_architecture/silver/enrollment_clean.parquet",
             "medallion_architecture/gold/enrollment_trends.parquet",
             "medallion_architecture/gold/school_performance.parquet",
-            "medallion_architecture/gold/demographics.parquet"
+            "medallion_architecture/gold/demographics.parquet",
+            "medallion_architecture/gold/region_distribution_sketches.parquet",
+            "medallion_architecture/gold/school_distribution_sketches.parquet",
+            "medallion_architecture/gold/dropout_risk_scores.parquet",
+            "medallion_architecture/gold/school_risk_distribution.parquet"
         ]
+        if distinct_mode == "approx":
+            output_files.append("medallion_architecture/gold/school_count_sketches.parquet")
         
         print("\nOutput Verification")
         print("-" * 20)
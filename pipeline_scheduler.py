@@ -1,8 +1,4 @@
-import schedule
 import time
-import subprocess
-import sys
-from datetime import datetime
 import logging
 
 # Configure logging for pipeline monitoring
@@ -16,36 +12,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def execute_data_pipeline():
+def execute_data_pipeline(distinct_mode="exact", risk_coefficients=None):
     """Execute the education analytics data pipeline"""
     logger.info("Starting scheduled data pipeline execution")
     
     try:
-        # Run the main data processing pipeline
-        result = subprocess.run([sys.executable, "medallion_pandas.py"], 
-                              capture_output=True, text=True, cwd=".")
+        # Run the main data processing pipeline in this process; pandas is
+        # only loaded on the first run
+        from medallion_pandas import run_medallion_pipeline
         
-        if result.returncode == 0:
+        if run_medallion_pipeline(distinct_mode, risk_coefficients):
             logger.info("Data pipeline executed successfully")
             logger.info("Analytics data updated and ready for reporting")
         else:
             logger.error("Data pipeline execution failed")
-            logger.error(result.stderr)
             
     except Exception as e:
         logger.error(f"Pipeline execution error: {e}")
 
-def start_pipeline_scheduler():
+def start_pipeline_scheduler(distinct_mode="exact", risk_coefficients=None):
     """Start the automated pipeline scheduler"""
+    import schedule
+    
     # Schedule daily execution at 6:00 AM
-    schedule.every().day.at("06:00").do(execute_data_pipeline)
+    schedule.every().day.at("06:00").do(execute_data_pipeline, distinct_mode, risk_coefficients)
     
     logger.info("Education Analytics Pipeline Scheduler Started")
     logger.info("Scheduled for daily execution at 6:00 AM")
     logger.info("Press Ctrl+C to stop the scheduler")
     
     # Execute pipeline once immediately for testing
-    execute_data_pipeline()
+    execute_data_pipeline(distinct_mode, risk_coefficients)
     
     # Keep scheduler running
     while True:
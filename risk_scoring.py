@@ -0,0 +1,122 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Logistic model coefficients. Features are scaled to roughly [0, 1]:
+# performance and attendance deficits are (100 - value) / 100, enrollment
+# decline is the school's year-over-year drop as a fraction, and tier is
+# 0 (Excellent), 1 (Satisfactory) or 2 (Needs Improvement).
+DEFAULT_RISK_COEFFICIENTS = {
+    'intercept': -4.0,
+    'performance_deficit': 8.0,
+    'attendance_deficit': 10.0,
+    'enrollment_decline': 3.0,
+    'school_tier': 0.75
+}
+
+# Rows at or above this score count as high risk in the school distributions
+HIGH_RISK_THRESHOLD = 0.5
+
+def load_risk_coefficients(path=None):
+    """Load a coefficient set from JSON, falling back to the defaults for missing keys"""
+    coefficients = dict(DEFAULT_RISK_COEFFICIENTS)
+    if path is None:
+        return coefficients
+
+    with open(path) as f:
+        overrides = json.load(f)
+
+    unknown = set(overrides) - set(DEFAULT_RISK_COEFFICIENTS)
+    if unknown:
+        raise ValueError(f"Unknown risk coefficients: {', '.join(sorted(unknown))}")
+
+    coefficients.update({name: float(value) for name, value in overrides.items()})
+    return coefficients
+
+def score_dropout_risk(performance, attendance, enrollment_decline, school_tier, coefficients=None):
+    """Vectorized dropout risk score in [0, 1] for a batch of rows
+
+    Takes NumPy arrays (or anything np.asarray accepts, such as Arrow arrays
+    or pandas Series) and works on whole columns at once, with no per-row
+    Python code.
+    """
+    c = coefficients or DEFAULT_RISK_COEFFICIENTS
+
+    logit = np.full(len(performance), c['intercept'], dtype=np.float64)
+    logit += c['performance_deficit'] * (100.0 - np.asarray(performance, dtype=np.float64)) / 100.0
+    logit += c['attendance_deficit'] * (100.0 - np.asarray(attendance, dtype=np.float64)) / 100.0
+    logit += c['enrollment_decline'] * np.asarray(enrollment_decline, dtype=np.float64)
+    logit += c['school_tier'] * np.asarray(school_tier, dtype=np.float64)
+
+    return 1.0 / (1.0 + np.exp(-logit))
+
+def build_risk_features(df):
+    """Derive enrollment decline and school tier for every silver row
+
+    Keys are factorized once and the per-school aggregates are NumPy
+    bincounts over a school x year grid, so the stage stays vectorized end
+    to end instead of going through string groupbys and a MultiIndex join.
+    """
+    school_codes, _ = pd.factorize(df['school_name'], use_na_sentinel=False)
+    region_codes, regions = pd.factorize(df['region'], use_na_sentinel=False)
+    school_id, schools = pd.factorize(school_codes.astype(np.int64) * len(regions) + region_codes)
+
+    years = df['academic_year'].to_numpy(dtype=np.int64)
+    first_year = years.min() if len(years) else 0
+    num_years = int(years.max() - first_year + 1) if len(years) else 1
+    cell = school_id * num_years + (years - first_year)
+    grid_size = len(schools) * num_years
+
+    # Year-over-year decline of each school's total enrollment, compared with
+    # the school's previous year on record; 0 for growth or the first year
+    enrollment = np.bincount(cell, weights=df['enrollment_count'].to_numpy(dtype=np.float64),
+                             minlength=grid_size).reshape(-1, num_years)
+    present = np.bincount(cell, minlength=grid_size).reshape(-1, num_years) > 0
+    last_seen = np.maximum.accumulate(np.where(present, np.arange(num_years), -1), axis=1)
+    previous_index = np.c_[np.full(len(schools), -1), last_seen[:, :-1]]
+    previous = np.take_along_axis(enrollment, np.maximum(previous_index, 0), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decline = np.where(previous_index >= 0, (previous - enrollment) / previous, 0.0)
+    decline = np.nan_to_num(np.clip(decline, 0, 1), nan=0.0)
+    enrollment_decline = decline.ravel()[cell]
+
+    # Same tier bins as the gold performance_tier, 2 = Needs Improvement
+    score_sum = np.bincount(school_id, weights=df['performance_score'].to_numpy(dtype=np.float64))
+    avg_score = (score_sum / np.bincount(school_id))[school_id]
+    school_tier = 2 - np.digitize(avg_score, [70, 85], right=True)
+
+    return enrollment_decline, school_tier
+
+def score_enrollment_rows(df, coefficients=None):
+    """Score every row of the silver data, returning its keys and dropout_risk_score"""
+    enrollment_decline, school_tier = build_risk_features(df)
+
+    scored = df[['school_name', 'region', 'academic_year', 'grade', 'gender']].copy()
+    scored['dropout_risk_score'] = score_dropout_risk(
+        df['performance_score'].to_numpy(),
+        df['attendance_rate'].to_numpy(),
+        enrollment_decline,
+        school_tier,
+        coefficients
+    ).round(4)
+
+    return scored
+
+def school_risk_distribution(scored):
+    """Summarize per-row risk scores into a distribution per school
+
+    Rows without a score (e.g. missing attendance_rate) are left out of every
+    statistic, including the high_risk_pct denominator.
+    """
+    keys = ['school_name', 'region']
+    risk = scored['dropout_risk_score']
+    by_school = [scored[k] for k in keys]
+    grouped = risk.groupby(by_school)
+
+    distribution = grouped.agg(['count', 'mean']).rename(columns={'count': 'scored_rows', 'mean': 'mean_risk'})
+    quantiles = grouped.quantile([0.1, 0.5, 0.9]).unstack().reindex(index=distribution.index, columns=[0.1, 0.5, 0.9])
+    distribution[['p10_risk', 'median_risk', 'p90_risk']] = quantiles.to_numpy()
+    high_risk = (risk >= HIGH_RISK_THRESHOLD).astype(np.float64).where(risk.notna())
+    distribution['high_risk_pct'] = high_risk.groupby(by_school).mean() * 100
+
+    return distribution.round({'mean_risk': 4, 'p10_risk': 4, 'median_risk': 4, 'p90_risk': 4, 'high_risk_pct': 2}).reset_index()
@@ -6,8 +6,7 @@ This script demonstrates the complete education analytics pipeline
 for the capstone project evaluation.
 """
 
-import subprocess
-import sys
+import importlib
 import os
 from datetime import datetime
 
@@ -23,19 +22,22 @@ def run_demo():
         {
             "step": 1,
             "title": "Data Processing Pipeline (Pandas & ETL)",
-            "script": "medallion_pandas.py",
+            "module": "medallion_pandas",
+            "function": "run_medallion_pipeline",
             "description": "Medallion Architecture implementation with Bronze/Silver/Gold layers"
         },
         {
             "step": 2, 
             "title": "Distributed Analytics (PySpark)",
-            "script": "spark_analytics.py",
+            "module": "spark_analytics",
+            "function": "run_spark_analytics",
             "description": "Large-scale data processing using Apache Spark"
         },
         {
             "step": 3,
             "title": "Power BI Data Export",
-            "script": "export_powerbi.py", 
+            "module": "export_powerbi",
+            "function": "export_analytics_for_powerbi",
             "description": "Dashboard-ready data export for visualization"
         }
     ]
@@ -48,14 +50,13 @@ def run_demo():
         print("-" * 50)
         
         try:
-            result = subprocess.run([sys.executable, demo_step['script']], 
-                                  capture_output=True, text=True, cwd=".")
+            # Each component runs in this interpreter and is only imported when its step starts
+            module = importlib.import_module(demo_step['module'])
             
-            if result.returncode == 0:
-                print(result.stdout)
+            if getattr(module, demo_step['function'])():
                 results[demo_step['step']] = "Success"
             else:
-                print(f"Error in {demo_step['title']}: {result.stderr}")
+                print(f"Error in {demo_step['title']}")
                 results[demo_step['step']] = "Failed"
                 
         except Exception as e:
@@ -0,0 +1,295 @@
+import numpy as np
+import pandas as pd
+
+# HyperLogLog precision: 2^12 registers gives a relative standard error of
+# 1.04 / sqrt(4096) ~= 1.6% on distinct counts, in a 4 KB sketch
+HLL_PRECISION = 12
+HLL_VERSION = 1
+
+def hll_relative_error(precision=HLL_PRECISION):
+    """Relative standard error of a HyperLogLog estimate at the given precision"""
+    return 1.04 / np.sqrt(2 ** precision)
+
+def _hll_sigma(x):
+    """Small-range correction term of Ertl's HyperLogLog estimator"""
+    if x == 1:
+        return np.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        previous = z
+        z += x * y
+        y += y
+        if z == previous:
+            return z
+
+def _hll_tau(x):
+    """Large-range correction term of Ertl's HyperLogLog estimator"""
+    if x == 0 or x == 1:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = np.sqrt(x)
+        previous = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == previous:
+            return z / 3
+
+class HyperLogLog:
+    """Mergeable approximate distinct-count sketch
+
+    Values are hashed with pandas' stable 64-bit hash, so sketches built in
+    different processes (pandas pipeline, Spark executors) can be merged.
+    """
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.num_registers = 2 ** precision
+        if registers is None:
+            registers = np.zeros(self.num_registers, dtype=np.uint8)
+        self.registers = registers
+
+    def update(self, values):
+        """Add an iterable of values to the sketch"""
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return self
+
+        hashes = pd.util.hash_array(values.to_numpy(dtype=object))
+        p = np.uint64(self.precision)
+
+        # First p bits select the register, remaining bits give the rank
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        # Drop the low 11 bits so the rest converts to float64 exactly
+        remainder = (hashes << p) >> np.uint64(11)
+        rank = np.full(len(hashes), min(54, 64 - self.precision + 1), dtype=np.uint8)
+        nonzero = remainder != 0
+        rank[nonzero] = 53 - np.floor(np.log2(remainder[nonzero].astype(np.float64))).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """Merge another sketch into this one (register-wise max)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """Approximate number of distinct values added to the sketch
+
+        Uses Ertl's improved estimator ("New cardinality estimation algorithms
+        for HyperLogLog sketches", 2017). It corrects the small and large
+        ranges from the register histogram, so unlike the classic raw estimate
+        with a linear-counting cutoff it has no biased hand-over range.
+        """
+        m = self.num_registers
+        # Highest rank update() can store, see the 11 dropped hash bits
+        q = min(53, 64 - self.precision)
+        counts = np.bincount(self.registers, minlength=q + 2).astype(np.float64)
+
+        z = m * _hll_tau(1 - counts[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + counts[k])
+        z += m * _hll_sigma(counts[0] / m)
+
+        if np.isinf(z):
+            return 0
+        return int(round(m * m / (2 * np.log(2)) / z))
+
+    def to_bytes(self):
+        """Serialize the sketch for storage in Parquet"""
+        return bytes([HLL_VERSION, self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a sketch serialized with to_bytes()"""
+        if data[0] != HLL_VERSION:
+            raise ValueError(f"Unsupported HyperLogLog sketch version: {data[0]}")
+        registers = np.frombuffer(data[2:], dtype=np.uint8).copy()
+        return cls(precision=data[1], registers=registers)
+
+def build_distinct_sketches(df, group_cols, value_col, name, precision=HLL_PRECISION):
+    """Build one serialized HyperLogLog sketch of value_col per group
+
+    Produces the columns <name>_sketch and approx_<name>_count.
+    """
+    rows = []
+    for key, group in df.groupby(group_cols, sort=True):
+        key = key if isinstance(key, tuple) else (key,)
+        sketch = HyperLogLog(precision).update(group[value_col])
+        rows.append((*key, sketch.to_bytes(), sketch.estimate()))
+
+    return pd.DataFrame(rows, columns=[*group_cols, f"{name}_sketch", f"approx_{name}_count"])
+
+def merge_distinct_sketches(sketches, group_cols, name):
+    """Roll serialized sketches up to a coarser grouping without rescanning silver"""
+    sketch_col = f"{name}_sketch"
+    rows = []
+    for key, group in sketches.groupby(group_cols, sort=True):
+        key = key if isinstance(key, tuple) else (key,)
+        merged = None
+        for data in group[sketch_col]:
+            sketch = HyperLogLog.from_bytes(data)
+            merged = sketch if merged is None else merged.merge(sketch)
+        rows.append((*key, merged.to_bytes(), merged.estimate()))
+
+    return pd.DataFrame(rows, columns=[*group_cols, sketch_col, f"approx_{name}_count"])
+
+# t-digest compression: groups with more than this many values are reduced
+# to roughly compression / 2 centroids; smaller groups keep their raw values
+TDIGEST_COMPRESSION = 200
+QUANTILES = (0.1, 0.5, 0.9)
+
+# Quantile sketches are stored in long format, one row per centroid:
+#   <group columns>, column, mean, weight
+# Raw values are centroids of weight 1, which Parquet stores almost for free.
+
+def _group_boundaries(group_ids):
+    """Start offsets and sizes of runs of equal ids in a sorted id array"""
+    if len(group_ids) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    starts = np.flatnonzero(np.r_[True, group_ids[1:] != group_ids[:-1]])
+    sizes = np.diff(np.r_[starts, len(group_ids)])
+    return starts, sizes
+
+def _compress_centroids(group_ids, means, weights, compression):
+    """Merging t-digest (k1 scale) over many groups at once
+
+    Sorts once by group and value, then builds every group's centroids with
+    cumulative sums and np.add.reduceat over the run boundaries. The smallest
+    and largest value of each group stay single centroids so quantiles keep
+    the exact range, and groups within the compression limit are left raw.
+    """
+    order = np.lexsort((means, group_ids))
+    group_ids, means, weights = group_ids[order], means[order], weights[order]
+    if len(group_ids) == 0:
+        return group_ids, means, weights
+
+    starts, sizes = _group_boundaries(group_ids)
+    cumulative = np.cumsum(weights)
+    group_before = np.repeat(cumulative[starts] - weights[starts], sizes)
+    group_total = np.repeat(np.add.reduceat(weights, starts), sizes)
+
+    # Position of each centroid's midpoint in its group, mapped to k-space
+    q = (cumulative - group_before - weights / 2) / group_total
+    k = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)))
+
+    boundary = np.r_[True, k[1:] != k[:-1]]
+    is_first = np.zeros(len(group_ids), dtype=bool)
+    is_first[starts] = True
+    is_last = np.r_[is_first[1:], True]
+    boundary |= is_first | is_last | np.r_[False, is_first[:-1]] | (group_total <= compression)
+
+    new_starts = np.flatnonzero(boundary)
+    new_weights = np.add.reduceat(weights, new_starts)
+    new_means = np.add.reduceat(means * weights, new_starts) / new_weights
+    return group_ids[new_starts], new_means, new_weights
+
+def _centroid_frame(keys, group_ids, column, means, weights):
+    frame = keys.iloc[group_ids].reset_index(drop=True)
+    frame['column'] = column
+    frame['mean'] = means
+    frame['weight'] = weights
+    return frame
+
+def build_quantile_sketches(groups, value_cols, compression=TDIGEST_COMPRESSION):
+    """Build t-digests of each value column for every group of a DataFrameGroupBy
+
+    Takes the same groupby object that produces the gold aggregates, so the
+    grouping is computed once and reused for the sketches.
+    """
+    df = groups.obj
+    group_ids = groups.ngroup().to_numpy()
+    keys = groups.size().index.to_frame(index=False)
+
+    frames = []
+    for column in value_cols:
+        values = df[column].to_numpy(dtype=np.float64)
+        valid = (group_ids >= 0) & ~np.isnan(values)
+        ids, means, weights = _compress_centroids(
+            group_ids[valid], values[valid], np.ones(np.count_nonzero(valid)), compression
+        )
+        frames.append(_centroid_frame(keys, ids, column, means, weights))
+
+    return pd.concat(frames, ignore_index=True)
+
+def merge_quantile_sketches(sketches, group_cols, compression=TDIGEST_COMPRESSION):
+    """Roll t-digests up to a coarser grouping, or merge appended batches
+
+    For incremental appends, concatenate the stored sketches with sketches
+    of the new batch and merge on the original grouping.
+    """
+    groups = sketches.groupby([*group_cols, 'column'], sort=True, observed=True)
+    ids, means, weights = _compress_centroids(
+        groups.ngroup().to_numpy(),
+        sketches['mean'].to_numpy(dtype=np.float64),
+        sketches['weight'].to_numpy(dtype=np.float64),
+        compression
+    )
+    keys = groups.size().index.to_frame(index=False)
+    frame = keys.iloc[ids].reset_index(drop=True)
+    frame['mean'] = means
+    frame['weight'] = weights
+    return frame
+
+def sketch_quantiles(sketches, group_cols, quantiles=QUANTILES):
+    """Quantiles per group and column, read straight from the centroids
+
+    Works on sketches at any grain finer than group_cols: centroids of all
+    partitions in a group are interpolated together, no merge step needed.
+    Returns group_cols, column and one p<NN> column per quantile.
+    """
+    columns = [f"p{round(quantile * 100):02d}" for quantile in quantiles]
+    if sketches.empty:
+        return pd.DataFrame(columns=[*group_cols, 'column', *columns])
+
+    groups = sketches.groupby([*group_cols, 'column'], sort=True, observed=True)
+    group_ids = groups.ngroup().to_numpy()
+    order = np.lexsort((sketches['mean'].to_numpy(), group_ids))
+    group_ids = group_ids[order]
+    means = sketches['mean'].to_numpy(dtype=np.float64)[order]
+    weights = sketches['weight'].to_numpy(dtype=np.float64)[order]
+    starts, sizes = _group_boundaries(group_ids)
+
+    # Centroid midpoints on one global axis; each group occupies its own span
+    cumulative = np.cumsum(weights)
+    centers = cumulative - weights / 2
+    group_before = cumulative[starts] - weights[starts]
+    group_total = np.add.reduceat(weights, starts)
+    first_center = centers[starts]
+    last_center = centers[starts + sizes - 1]
+
+    # Same positions as linear interpolation over raw values: q * (n - 1)
+    q = np.asarray(quantiles, dtype=np.float64)
+    targets = group_before[:, None] + q[None, :] * (group_total[:, None] - 1) + 0.5
+    targets = np.clip(targets, first_center[:, None], last_center[:, None])
+    values = np.interp(targets.ravel(), centers, means).reshape(len(starts), len(q))
+
+    result = groups.size().index.to_frame(index=False)
+    for i, column in enumerate(columns):
+        result[column] = values[:, i].round(2)
+    return result
+
+def summarize_quantile_sketches(sketches, group_cols, labels):
+    """Report P10, median and P90 per group in wide format
+
+    labels maps each sketched column to its short name in the output,
+    e.g. {"performance_score": "score"} gives p10_score, median_score, p90_score.
+    """
+    quantiles = sketch_quantiles(sketches[sketches['column'].isin(list(labels))], group_cols, QUANTILES)
+    wide = quantiles.pivot(index=group_cols, columns='column', values=['p10', 'p50', 'p90'])
+    # Columns with no values in any group (e.g. all NaN) come back as NaN
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([['p10', 'p50', 'p90'], list(labels)]))
+
+    summary = pd.DataFrame(index=wide.index)
+    for value_col, label in labels.items():
+        summary[f"p10_{label}"] = wide[('p10', value_col)]
+        summary[f"median_{label}"] = wide[('p50', value_col)]
+        summary[f"p90_{label}"] = wide[('p90', value_col)]
+
+    return summary.reset_index()
@@ -1,11 +1,143 @@
-from pyspark.sql import SparkSession
-from pyspark.sql.functions import *
-from pyspark.sql.types import *
 import pandas as pd
 import os
+from risk_scoring import HIGH_RISK_THRESHOLD, score_dropout_risk
+from sketches import (HLL_PRECISION, TDIGEST_COMPRESSION, HyperLogLog, build_quantile_sketches, hll_relative_error,
+                      merge_distinct_sketches, summarize_quantile_sketches)
+
+def build_spark_distinct_sketches(df, group_cols, value_col, name, precision=HLL_PRECISION):
+    """Build mergeable HyperLogLog sketches of value_col per group
+
+    Each partition sketches its own rows, so only the small serialized
+    sketches are shuffled to be merged, never the raw values.
+    """
+    from pyspark.sql.types import BinaryType, LongType, StructField, StructType
+    
+    sketch_schema = StructType(
+        [df.schema[c] for c in group_cols] + [
+            StructField(f"{name}_sketch", BinaryType(), False),
+            StructField(f"approx_{name}_count", LongType(), False)
+        ]
+    )
+    
+    def sketch_partition(batches):
+        partial = {}
+        for batch in batches:
+            for key, group in batch.groupby(group_cols, sort=False):
+                key = key if isinstance(key, tuple) else (key,)
+                partial.setdefault(key, HyperLogLog(precision)).update(group[value_col])
+        
+        rows = [(*key, sketch.to_bytes(), sketch.estimate()) for key, sketch in partial.items()]
+        yield pd.DataFrame(rows, columns=sketch_schema.fieldNames())
+    
+    def merge_group(sketches):
+        return merge_distinct_sketches(sketches, group_cols, name)
+    
+    return df.select(*group_cols, value_col) \
+             .mapInPandas(sketch_partition, sketch_schema) \
+             .groupBy(*group_cols) \
+             .applyInPandas(merge_group, sketch_schema)
+
+def build_spark_quantile_sketches(df, group_cols, value_cols, compression=TDIGEST_COMPRESSION):
+    """Build t-digest centroids of each value column per group
+
+    Each group is digested inside applyInPandas with the same vectorized
+    builder as the pandas pipeline, so only the centroids leave the executors.
+    """
+    from pyspark.sql.types import DoubleType, StringType, StructField, StructType
+    
+    sketch_schema = StructType(
+        [df.schema[c] for c in group_cols] + [
+            StructField("column", StringType(), False),
+            StructField("mean", DoubleType(), False),
+            StructField("weight", DoubleType(), False)
+        ]
+    )
+    
+    def digest_group(rows):
+        return build_quantile_sketches(rows.groupby(group_cols), value_cols, compression)
+    
+    return df.select(*group_cols, *value_cols) \
+             .groupBy(*group_cols) \
+             .applyInPandas(digest_group, sketch_schema)
+
+def build_spark_quantile_summary(df, group_cols, labels, compression=TDIGEST_COMPRESSION):
+    """P10, median and P90 per group, computed where the group's rows live
+
+    labels maps each value column to its short output name, as in
+    summarize_quantile_sketches; only the quantile columns are returned.
+    """
+    from pyspark.sql.types import DoubleType, StructField, StructType
+    
+    summary_schema = StructType(
+        [df.schema[c] for c in group_cols] +
+        [StructField(f"{prefix}_{label}", DoubleType(), True)
+         for label in labels.values() for prefix in ["p10", "median", "p90"]]
+    )
+    
+    def summarize_group(rows):
+        sketches = build_quantile_sketches(rows.groupby(group_cols), list(labels), compression)
+        return summarize_quantile_sketches(sketches, group_cols, labels)[summary_schema.fieldNames()]
+    
+    return df.select(*group_cols, *labels) \
+             .groupBy(*group_cols) \
+             .applyInPandas(summarize_group, summary_schema)
+
+def spark_performance_tier(avg_score):
+    """Tier code shared by performance_category and the risk model
+
+    0 = Excellent (>= 85), 1 = Satisfactory (>= 70), 2 = Needs Improvement.
+    """
+    from pyspark.sql.functions import when
+    
+    return when(avg_score >= 85, 0).when(avg_score >= 70, 1).otherwise(2)
+
+def build_spark_risk_scores(df, coefficients=None):
+    """Add dropout_risk_score to every row with a vectorized pandas UDF
+
+    Features follow risk_scoring.build_risk_features, except that school
+    tiers come from spark_performance_tier so they agree with this path's
+    performance_category. Scoring runs the same NumPy batch function on each
+    Arrow batch.
+    """
+    from pyspark.sql.functions import avg, col, lag, lit, pandas_udf, sum, when
+    from pyspark.sql.window import Window
+    
+    keys = ["school_name", "region"]
+    
+    # Year-over-year decline of each school's total enrollment, 0 for growth or the first year
+    yearly = df.groupBy(*keys, "academic_year").agg(sum("enrollment_count").alias("school_enrollment"))
+    previous = lag("school_enrollment").over(Window.partitionBy(*keys).orderBy("academic_year"))
+    yearly = yearly.withColumn(
+        "enrollment_decline",
+        when(previous.isNull(), lit(0.0))
+        .otherwise(((previous - col("school_enrollment")) / previous).cast("double"))
+    ).withColumn(
+        "enrollment_decline",
+        when(col("enrollment_decline") < 0, lit(0.0))
+        .when(col("enrollment_decline") > 1, lit(1.0))
+        .otherwise(col("enrollment_decline"))
+    )
+    
+    # Same tiers as the Spark performance_category
+    school_avg = avg("performance_score").over(Window.partitionBy(*keys))
+    features = df.join(yearly.select(*keys, "academic_year", "enrollment_decline"),
+                       on=[*keys, "academic_year"], how="left") \
+                 .withColumn("school_tier", spark_performance_tier(school_avg))
+    
+    @pandas_udf("double")
+    def risk_udf(performance: pd.Series, attendance: pd.Series, decline: pd.Series, tier: pd.Series) -> pd.Series:
+        return pd.Series(score_dropout_risk(performance, attendance, decline, tier, coefficients))
+    
+    return features.withColumn(
+        "dropout_risk_score",
+        risk_udf(col("performance_score"), col("attendance_rate"), col("enrollment_decline"), col("school_tier"))
+    ).drop("enrollment_decline", "school_tier")
 
 class EducationAnalytics:
     def __init__(self):
+        # PySpark is imported here so loading this module stays cheap
+        from pyspark.sql import SparkSession
+        
         # Initialize Spark session for distributed processing
         self.spark = SparkSession.builder \
             .appName("EducationAnalytics") \
@@ -14,10 +146,22 @@ class EducationAnalytics:
             .getOrCreate()
         
         self.spark.sparkContext.setLogLevel("ERROR")
+        for module_file in ["sketches.py", "risk_scoring.py"]:
+            self.spark.sparkContext.addPyFile(os.path.join(os.path.dirname(os.path.abspath(__file__)), module_file))
         print("Spark session initialized for large-scale data processing")
     
-    def process_enrollment_data(self):
-        """Process enrollment data using PySpark for scalable analytics"""
+    def process_enrollment_data(self, distinct_mode="exact", risk_coefficients=None):
+        """Process enrollment data using PySpark for scalable analytics
+
+        distinct_mode="approx" replaces COUNT(DISTINCT school_name) with
+        HyperLogLog sketches that can be merged for coarser rollups.
+        risk_coefficients overrides the default dropout risk model.
+        """
+        if distinct_mode not in ("exact", "approx"):
+            raise ValueError(f"Unknown distinct_mode: {distinct_mode}")
+        
+        from pyspark.sql.functions import avg, col, count, desc, initcap, lag, percentile_approx, round, sum, upper, when
+        from pyspark.sql.types import DoubleType, IntegerType, StringType, StructField, StructType
         
         print("\nEducation Analytics - PySpark Implementation")
         print("=" * 50)
@@ -45,7 +189,8 @@ class EducationAnalytics:
             (col("enrollment_count") > 0) &
             (col("performance_score").between(0, 100)) &
             (col("academic_year").between(2020, 2024)) &
-            (col("region").isNotNull())
+            (col("region").isNotNull()) &
+            (col("school_name").isNotNull())
         )
         
         # Standardize data formats
@@ -57,26 +202,42 @@ class EducationAnalytics:
         df_clean = df_clean.withColumn("at_risk_student", 
                                       when(col("performance_score") < 70, 1).otherwise(0))
         
+        # Cleaned rows feed the SQL trends, the aggregations and every sketch/scoring stage
+        df_clean = df_clean.cache()
+        
         print(f"Data validation completed: {df_clean.count():,} records processed")
         
         # Register for SQL operations
         df_clean.createOrReplaceTempView("enrollment_data")
         
+        # Exact distinct counts need a full shuffle; approx mode joins sketch estimates instead
+        school_count_expr = ",\n            COUNT(DISTINCT school_name) as school_count" if distinct_mode == "exact" else ""
+        
         # Generate enrollment trends using Spark SQL
-        trends_query = """
+        trends_query = f"""
         SELECT 
             academic_year,
             region,
             SUM(enrollment_count) as total_enrollment,
             ROUND(AVG(performance_score), 2) as avg_performance,
-            SUM(at_risk_student) as at_risk_students,
-            COUNT(DISTINCT school_name) as school_count
+            SUM(at_risk_student) as at_risk_students{school_count_expr}
         FROM enrollment_data
         GROUP BY academic_year, region
         ORDER BY region, academic_year
         """
         
         trends_df = self.spark.sql(trends_query)
+        
+        school_count_sketches = None
+        if distinct_mode == "approx":
+            # Cached because the sketches feed both the trends join and the parquet export
+            school_count_sketches = build_spark_distinct_sketches(df_clean, ["academic_year", "region"], "school_name", "school").cache()
+            trends_df = trends_df.join(
+                school_count_sketches.select("academic_year", "region", col("approx_school_count").alias("school_count")),
+                on=["academic_year", "region"],
+                how="left"
+            ).orderBy("region", "academic_year")
+            print(f"School counts estimated from HyperLogLog sketches (relative error ~{hll_relative_error():.1%})")
         print("Generated enrollment trends analysis using distributed SQL processing")
         
         # Calculate growth rates using window functions
@@ -101,11 +262,43 @@ class EducationAnalytics:
         # Performance classification
         school_performance = school_performance.withColumn(
             "performance_category",
-            when(col("avg_score") >= 85, "Excellent")
-            .when(col("avg_score") >= 70, "Satisfactory")
+            when(spark_performance_tier(col("avg_score")) == 0, "Excellent")
+            .when(spark_performance_tier(col("avg_score")) == 1, "Satisfactory")
             .otherwise("Needs Improvement")
         )
         
+        # Region-year t-digests for stored rollups, and per-school percentiles
+        # computed inside each school's group so only three columns per value are collected
+        distribution_cols = ["performance_score", "attendance_rate"]
+        distribution_sketches = build_spark_quantile_sketches(
+            df_clean, ["academic_year", "region"], distribution_cols
+        )
+        school_quantiles = build_spark_quantile_summary(
+            df_clean, ["school_name", "region"],
+            {"performance_score": "score", "attendance_rate": "attendance"}
+        )
+        
+        # Multi-factor dropout risk per row, summarized per school
+        # Cached because the scores feed both the school distribution and the per-row export
+        risk_scores = build_spark_risk_scores(df_clean, risk_coefficients).cache()
+        risk_quantiles = percentile_approx("dropout_risk_score", [0.1, 0.5, 0.9])
+        school_risk = risk_scores.groupBy("school_name", "region") \
+                                 .agg(
+                                     count("dropout_risk_score").alias("scored_rows"),
+                                     round(avg("dropout_risk_score"), 4).alias("mean_risk"),
+                                     risk_quantiles.alias("risk_quantiles"),
+                                     round(avg(when(col("dropout_risk_score") >= HIGH_RISK_THRESHOLD, 1)
+                                               .when(col("dropout_risk_score").isNotNull(), 0)) * 100, 2)
+                                         .alias("high_risk_pct")
+                                 ) \
+                                 .select(
+                                     "school_name", "region", "scored_rows", "mean_risk",
+                                     round(col("risk_quantiles")[0], 4).alias("p10_risk"),
+                                     round(col("risk_quantiles")[1], 4).alias("median_risk"),
+                                     round(col("risk_quantiles")[2], 4).alias("p90_risk"),
+                                     "high_risk_pct"
+                                 )
+        
         print("Completed school performance analysis with distributed aggregations")
         
         # Display sample results
@@ -120,19 +313,40 @@ class EducationAnalytics:
         
         trends_pandas = trends_with_growth.toPandas()
         performance_pandas = school_performance.toPandas()
+        sketches_pandas = distribution_sketches.toPandas()
+        risk_pandas = school_risk.toPandas()
+        
+        performance_pandas = performance_pandas.merge(school_quantiles.toPandas(), on=["school_name", "region"], how="left")
         
         # Save results
         os.makedirs("spark_analytics", exist_ok=True)
         trends_pandas.to_csv("spark_analytics/enrollment_trends_spark.csv", index=False)
         performance_pandas.to_csv("spark_analytics/school_performance_spark.csv", index=False)
+        risk_pandas.to_csv("spark_analytics/school_risk_distribution_spark.csv", index=False)
+        
+        # Sketches are kept in Parquet for later rollups
+        sketches_pandas.to_parquet("spark_analytics/region_distribution_sketches_spark.parquet", index=False)
+        if school_count_sketches is not None:
+            school_count_sketches.toPandas().to_parquet("spark_analytics/school_count_sketches_spark.parquet", index=False)
+        
+        # Per-row scores in the same layout as gold/dropout_risk_scores.parquet. Tiers
+        # follow this path's performance_category (>= 70, >= 85) while pandas bins with
+        # pd.cut, so schools averaging exactly 70 or 85 land one tier higher here.
+        # Written by Spark directly since the row-level table is too large to collect
+        risk_scores.select("school_name", "region", "academic_year", "grade", "gender",
+                           round("dropout_risk_score", 4).alias("dropout_risk_score")) \
+                   .write.mode("overwrite").parquet("spark_analytics/dropout_risk_scores_spark.parquet")
         
         print(f"Spark analytics completed:")
         print(f"- Enrollment trends: {len(trends_pandas)} records")
         print(f"- School performance: {len(performance_pandas)} schools")
+        print(f"- Dropout risk scores: {risk_scores.count():,} records")
+        print(f"- Dropout risk distribution: {len(risk_pandas)} schools")
         
         return {
             'trends': trends_pandas,
             'performance': performance_pandas,
+            'risk_distribution': risk_pandas,
             'total_records': df.count(),
             'clean_records': df_clean.count()
         }
@@ -142,18 +356,18 @@ class EducationAnalytics:
         self.spark.stop()
         print("Spark session terminated")
 
-def run_spark_analytics():
+def run_spark_analytics(distinct_mode="exact", risk_coefficients=None):
     """Execute PySpark analytics for education data"""
     
     analytics = EducationAnalytics()
     
     try:
-        results = analytics.process_enrollment_data()
+        results = analytics.process_enrollment_data(distinct_mode, risk_coefficients)
         
         print(f"\nPySpark Analytics Summary:")
         print(f"Total records processed: {results['total_records']:,}")
         print(f"Valid records analyzed: {results['clean_records']:,}")
-        print(f"Analytics datasets created: 2")
+        print(f"Analytics datasets created: 3")
         print("Results exported for dashboard visualization")
         
         return True
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from risk_scoring import build_risk_features, school_risk_distribution, score_enrollment_rows
+
+def reference_risk_features(df):
+    """Plain groupby/shift version of build_risk_features"""
+    keys = ['school_name', 'region']
+    yearly = df.groupby([*keys, 'academic_year'])['enrollment_count'].sum().reset_index()
+    previous = yearly.groupby(keys)['enrollment_count'].shift()
+    yearly['decline'] = ((previous - yearly['enrollment_count']) / previous).clip(0, 1).fillna(0)
+    decline = df.merge(yearly, on=[*keys, 'academic_year'], how='left')['decline']
+
+    avg_score = df.groupby(keys)['performance_score'].transform('mean')
+    tier = pd.cut(avg_score, bins=[-np.inf, 70, 85, np.inf], labels=[2, 1, 0]).astype(int)
+    return decline.to_numpy(), tier.to_numpy()
+
+def enrollment_rows():
+    rng = np.random.default_rng(7)
+    rows = []
+    for school, region, years in [
+        ('Lincoln Elementary', 'NORTH', [2020, 2021, 2022, 2023]),
+        ('Lincoln Elementary', 'SOUTH', [2021, 2022]),
+        # 2021 missing: 2022 is compared with 2020
+        ('Roosevelt Middle', 'EAST', [2020, 2022, 2023]),
+        ('Washington High', 'WEST', [2024])
+    ]:
+        for year in years:
+            for grade in ['K', '1', '2']:
+                rows.append((school, region, year, grade, 'Female', int(rng.integers(0, 40)),
+                             float(rng.normal(78, 10)), float(rng.normal(90, 5))))
+    df = pd.DataFrame(rows, columns=['school_name', 'region', 'academic_year', 'grade', 'gender',
+                                     'enrollment_count', 'performance_score', 'attendance_rate'])
+    # Rows arrive in no particular order
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+def test_risk_features_match_groupby_reference():
+    df = enrollment_rows()
+    decline, tier = build_risk_features(df)
+    expected_decline, expected_tier = reference_risk_features(df)
+
+    np.testing.assert_allclose(decline, expected_decline)
+    np.testing.assert_array_equal(tier, expected_tier)
+
+def test_missing_year_compares_with_previous_year_on_record():
+    df = enrollment_rows()
+    decline, _ = build_risk_features(df)
+    roosevelt = df['school_name'] == 'Roosevelt Middle'
+    totals = df[roosevelt].groupby('academic_year')['enrollment_count'].sum()
+
+    expected = max(0.0, min(1.0, (totals[2020] - totals[2022]) / totals[2020]))
+    np.testing.assert_allclose(decline[roosevelt & (df['academic_year'] == 2022)], expected)
+    assert (decline[roosevelt & (df['academic_year'] == 2020)] == 0).all()
+
+def test_tier_boundaries_match_gold_performance_tier():
+    df = enrollment_rows()
+    for school, score in [('Lincoln Elementary', 70.0), ('Roosevelt Middle', 85.0), ('Washington High', 85.01)]:
+        df.loc[df['school_name'] == school, 'performance_score'] = score
+    _, tier = build_risk_features(df)
+    _, expected_tier = reference_risk_features(df)
+    np.testing.assert_array_equal(tier, expected_tier)
+
+def test_missing_attendance_left_out_of_distribution():
+    df = enrollment_rows()
+    lincoln = (df['school_name'] == 'Lincoln Elementary') & (df['region'] == 'SOUTH')
+    df.loc[lincoln & (df['academic_year'] == 2021), 'attendance_rate'] = np.nan
+    df.loc[lincoln, 'performance_score'] = 0.0
+
+    scored = score_enrollment_rows(df)
+    distribution = school_risk_distribution(scored).set_index(['school_name', 'region'])
+    row = distribution.loc[('Lincoln Elementary', 'SOUTH')]
+
+    assert row['scored_rows'] == 3
+    assert row['high_risk_pct'] == 100.0
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketches import (
+    HLL_PRECISION, QUANTILES, TDIGEST_COMPRESSION, HyperLogLog, build_quantile_sketches,
+    hll_relative_error, merge_quantile_sketches, sketch_quantiles, summarize_quantile_sketches
+)
+
+# Three standard errors of a single estimate
+HLL_TOLERANCE = 3 * hll_relative_error(HLL_PRECISION)
+
+def school_names(start, stop):
+    return pd.Series([f"School {i}" for i in range(start, stop)])
+
+@pytest.mark.parametrize("count", [0, 1, 1_000, 10_000, 1_000_000])
+def test_hll_estimate_within_three_sigma(count):
+    values = np.arange(count) if count > 10_000 else school_names(0, count)
+    estimate = HyperLogLog().update(values).estimate()
+    assert abs(estimate - count) <= HLL_TOLERANCE * max(count, 1)
+
+def test_hll_estimate_small_counts_exact():
+    assert HyperLogLog().estimate() == 0
+    assert HyperLogLog().update(["School 1", "School 1", None]).estimate() == 1
+
+def test_hll_ignores_duplicates():
+    names = school_names(0, 5_000)
+    once = HyperLogLog().update(names)
+    twice = HyperLogLog().update(pd.concat([names, names]))
+    assert np.array_equal(once.registers, twice.registers)
+
+def test_hll_merge_equals_union():
+    left = HyperLogLog().update(school_names(0, 6_000))
+    right = HyperLogLog().update(school_names(4_000, 10_000))
+    union = HyperLogLog().update(school_names(0, 10_000))
+
+    left.merge(right)
+    assert np.array_equal(left.registers, union.registers)
+    assert left.estimate() == union.estimate()
+
+def test_hll_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(10))
+
+def test_hll_bytes_round_trip():
+    sketch = HyperLogLog().update(school_names(0, 2_500))
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+
+    assert restored.precision == sketch.precision
+    assert np.array_equal(restored.registers, sketch.registers)
+    assert restored.estimate() == sketch.estimate()
+
+def test_hll_from_bytes_rejects_unknown_version():
+    data = bytearray(HyperLogLog().to_bytes())
+    data[0] = 99
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(bytes(data))
+
+@pytest.mark.parametrize("count", [1_000, 3_000, 10_000])
+def test_hll_unbiased_across_seeds(count):
+    # Mean error over independent value sets, across the range where the
+    # classic estimator handed over from linear counting
+    seeds = 50
+    errors = []
+    for seed in range(seeds):
+        values = np.random.default_rng(seed).choice(2 ** 40, count, replace=False)
+        errors.append(HyperLogLog().update(values).estimate() / count - 1)
+    assert abs(np.mean(errors)) <= HLL_TOLERANCE / np.sqrt(seeds)
+
+def enrollment_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'region': rng.choice(['NORTH', 'SOUTH', 'EAST'], rows),
+        'performance_score': rng.normal(78, 10, rows).clip(0, 100),
+        'attendance_rate': rng.normal(90, 5, rows).clip(0, 100)
+    })
+
+def test_quantiles_exact_for_small_groups():
+    df = enrollment_frame(450)
+    assert df.groupby('region').size().max() <= TDIGEST_COMPRESSION
+
+    sketches = build_quantile_sketches(df.groupby('region'), ['performance_score', 'attendance_rate'])
+    result = sketch_quantiles(sketches, ['region']).set_index(['region', 'column'])
+
+    for (region, column), row in result.iterrows():
+        values = df.loc[df['region'] == region, column]
+        expected = np.quantile(values, QUANTILES).round(2)
+        np.testing.assert_allclose(row[['p10', 'p50', 'p90']].to_numpy(dtype=float), expected, atol=0.01)
+
+def test_quantiles_after_appending_batches():
+    batches = [enrollment_frame(2_000, seed) for seed in range(50)]
+    stored = None
+    for batch in batches:
+        new = build_quantile_sketches(batch.groupby('region'), ['performance_score'])
+        stored = new if stored is None else merge_quantile_sketches(pd.concat([stored, new]), ['region'])
+
+    # Merged digests stay compressed rather than growing with every batch
+    assert stored.groupby('region').size().max() <= TDIGEST_COMPRESSION
+
+    df = pd.concat(batches)
+    result = sketch_quantiles(stored, ['region']).set_index('region')
+    for region, row in result.iterrows():
+        values = np.sort(df.loc[df['region'] == region, 'performance_score'].to_numpy())
+        for quantile in QUANTILES:
+            estimate = row[f"p{round(quantile * 100):02d}"]
+            # Compare in rank space: the estimate's position among the raw values
+            rank = np.searchsorted(values, estimate) / len(values)
+            assert abs(rank - quantile) <= 0.005
+
+def test_quantiles_empty_input():
+    df = enrollment_frame(0)
+    sketches = build_quantile_sketches(df.groupby('region'), ['performance_score'])
+    assert sketches.empty
+
+    result = sketch_quantiles(sketches, ['region'])
+    assert result.empty
+    assert list(result.columns) == ['region', 'column', 'p10', 'p50', 'p90']
+
+    summary = summarize_quantile_sketches(sketches, ['region'], {'performance_score': 'score'})
+    assert summary.empty
+    assert list(summary.columns) == ['region', 'p10_score', 'median_score', 'p90_score']
+
+def test_quantiles_nan_only_column():
+    df = enrollment_frame(300)
+    df['attendance_rate'] = np.nan
+    groups = df.groupby('region')
+    sketches = build_quantile_sketches(groups, ['performance_score', 'attendance_rate'])
+    assert set(sketches['column']) == {'performance_score'}
+
+    summary = summarize_quantile_sketches(
+        sketches, ['region'], {'performance_score': 'score', 'attendance_rate': 'attendance'}
+    ).set_index('region')
+    assert summary[['p10_attendance', 'median_attendance', 'p90_attendance']].isna().all().all()
+    expected = groups['performance_score'].median().round(2)
+    np.testing.assert_allclose(summary['median_score'], expected.loc[summary.index], atol=0.01)